@@ -3,72 +3,238 @@ VALORANT パケットロス追跡ツール - デモ用データ生成スクリ
 実際のテストを行わずに、サンプルデータで機能をテストできます。
 """
 
-import random
 import json
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
 from rich.console import Console
+from rich.progress import Progress
+
+# Numbaは任意依存（あれば大規模データ生成をJITコンパイルで高速化）
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
 
-from main import VALORANTServerTracker, PingResult
-from font_utils import setup_matplotlib_japanese
+from main import VALORANTServerTracker, PingResult, NetworkStats
 
 console = Console()
 
-# 日本語フォント設定
-setup_matplotlib_japanese()
+# モジュール共通のRNG（PCG64）。グローバルなメルセンヌ・ツイスタより状態が小さく、
+# 呼び出しごとにGeneratorを作り直さずに両ジェネレーターで使い回す
+_rng = np.random.default_rng()
 
-def generate_demo_data(duration_minutes: int = 10, region: str = "Tokyo (Japan)") -> list:
-    """デモ用のパケットロスデータを生成"""
-    tracker = VALORANTServerTracker()
-    results = []
-    
-    if region not in tracker.VALORANT_SERVERS:
+# これ以上のサンプル数ではNumbaカーネルの方が速い（コンパイルコストを考慮）
+_NUMBA_THRESHOLD = 200_000
+
+# 3分岐（ロス2% / 高レイテンシー5% / 通常93%）の累積確率境界
+_BRANCH_EDGES = np.array([0.02, 0.07])
+
+if _HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _sample_latencies_numba(n, base_lo, base_hi, jitter_lo, jitter_hi,
+                                loss_p, high_p, spike_lo, spike_hi, seed):
+        """パケットロス／レイテンシーのサンプリングカーネル（Numba JIT）"""
+        np.random.seed(seed)
+        latency = np.empty(n, dtype=np.float64)
+        loss = np.zeros(n, dtype=np.bool_)
+        for i in prange(n):
+            u = np.random.random()
+            base = np.random.uniform(base_lo, base_hi)
+            if u < loss_p:
+                loss[i] = True
+                latency[i] = np.nan
+            elif u < loss_p + high_p:
+                latency[i] = base + np.random.uniform(spike_lo, spike_hi)
+            else:
+                latency[i] = max(1.0, base + np.random.uniform(jitter_lo, jitter_hi))
+        return latency, loss
+
+
+# 直近に生成したタイムスタンプ文字列配列のキャッシュ
+# （同じ開始時刻・秒数なら両ジェネレーター間で再利用できる）
+_ts_cache = {}
+
+
+def _timestamp_strings(start_ns: int, total_seconds: int) -> np.ndarray:
+    """秒単位のISOタイムスタンプ文字列を一括生成"""
+    key = (start_ns, total_seconds)
+    cached = _ts_cache.get(key)
+    if cached is None:
+        start = datetime.fromtimestamp(start_ns / 1_000_000_000)
+        cached = pd.date_range(start, periods=total_seconds, freq='s') \
+            .strftime('%Y-%m-%dT%H:%M:%S').to_numpy()
+        _ts_cache.clear()  # 直近の1エントリだけ保持
+        _ts_cache[key] = cached
+    return cached
+
+
+class DemoBuffer(namedtuple('DemoBuffer', 'ts server_id servers latency loss timeout')):
+    """デモ結果を列指向（SoA）で保持するバッファ
+
+    PingResultオブジェクトのリストと比べてメモリ使用量を大幅に削減し、
+    NumPyによる一括集計を可能にする。
+    - ts: int64 エポックナノ秒
+    - server_id: int16 のサーバーインデックス（serversへの参照）
+    - servers: サーバー名（ラベル）の配列
+    - latency: float32 のレイテンシー(ms)、ロス時はNaN
+    - loss / timeout: bool配列
+    """
+    __slots__ = ()
+
+    def to_pingresults(self):
+        """従来のPingResultリスト互換のジェネレーター"""
+        if len(self.ts) == 0:
+            return
+        servers = self.servers
+        n_servers = len(servers)
+        # ISO文字列への変換はシリアライズ境界で一括実行
+        ts_strs = _timestamp_strings(int(self.ts[0]), len(self.ts) // n_servers)
+        for idx, (sid, lat, loss, tmo) in enumerate(zip(
+                self.server_id, self.latency, self.loss, self.timeout)):
+            yield PingResult(
+                timestamp=ts_strs[idx // n_servers],
+                server=str(servers[sid]),
+                latency=None if loss else float(lat),
+                packet_loss=bool(loss),
+                timeout=bool(tmo)
+            )
+
+    def stats_per_server(self):
+        """サーバーごとのNetworkStatsをNumPyの一括集計で計算
+
+        PingResultのリストをPythonループで舐める代わりに、
+        (秒数, サーバー数) へreshapeして列方向のリダクションで求める。
+        """
+        n_servers = len(self.servers)
+        stats = {}
+        if len(self.latency) == 0:
+            return stats
+
+        latency = self.latency.reshape(-1, n_servers).astype(np.float64)
+        loss = self.loss.reshape(-1, n_servers)
+        total_packets = loss.shape[0]
+        lost_packets = loss.sum(axis=0)
+
+        for j, name in enumerate(self.servers):
+            valid = latency[~loss[:, j], j]
+            if len(valid) > 0:
+                min_latency = float(valid.min())
+                max_latency = float(valid.max())
+                avg_latency = float(valid.mean())
+                jitter = float(valid.std(ddof=1)) if len(valid) > 1 else 0
+            else:
+                min_latency = max_latency = avg_latency = jitter = 0
+
+            stats[str(name)] = NetworkStats(
+                total_packets=total_packets,
+                lost_packets=int(lost_packets[j]),
+                packet_loss_rate=float(lost_packets[j] / total_packets) * 100,
+                min_latency=min_latency,
+                max_latency=max_latency,
+                avg_latency=avg_latency,
+                jitter=jitter
+            )
+
+        return stats
+
+
+def _make_demo_buffer(start_time: datetime, labels: list,
+                      latency, loss_mask) -> DemoBuffer:
+    """(秒数, サーバー数) 形状の配列からDemoBufferを構築"""
+    total_seconds, n_servers = latency.shape
+    start_ns = int(start_time.timestamp()) * 1_000_000_000
+    ts = np.repeat(
+        np.arange(total_seconds, dtype=np.int64) * 1_000_000_000 + start_ns,
+        n_servers
+    )
+    server_id = np.tile(np.arange(n_servers, dtype=np.int16), total_seconds)
+    return DemoBuffer(
+        ts=ts,
+        server_id=server_id,
+        servers=np.array(labels),
+        # ミリ秒単位のレイテンシーにfloat64の精度は不要（可視化・統計用途）
+        latency=latency.ravel().astype(np.float32),
+        loss=loss_mask.ravel(),
+        timeout=loss_mask.ravel()
+    )
+
+
+def generate_demo_buffer(duration_minutes: int = 10,
+                         region: str = "Tokyo (Japan)",
+                         tracker: Optional[VALORANTServerTracker] = None,
+                         rng: Optional[np.random.Generator] = None):
+    """デモ用のパケットロスデータをDemoBufferとして生成
+
+    サーバー一覧の参照だけならトラッカーを新規生成する必要はないため、
+    trackerが渡されなければクラス属性を直接読む。
+    """
+    servers_by_region = (tracker.VALORANT_SERVERS if tracker is not None
+                         else VALORANTServerTracker.VALORANT_SERVERS)
+
+    if region not in servers_by_region:
         console.print(f"[red]❌ 無効なリージョン: {region}[/red]")
-        return []
-    
-    servers = tracker.VALORANT_SERVERS[region]
+        return None
+
+    servers = servers_by_region[region]
     start_time = datetime.now() - timedelta(minutes=duration_minutes)
-    
-    # 時間経過をシミュレート
-    for minute in range(duration_minutes * 60):  # 秒単位でデータ生成
-        timestamp = start_time + timedelta(seconds=minute)
-        
-        for server in servers:
-            # リアルなレイテンシーとパケットロスを生成
-            base_latency = random.uniform(15, 35)  # 東京サーバーの基本レイテンシー
-            
-            # 時々発生するネットワーク問題をシミュレート
-            if random.random() < 0.02:  # 2%の確率でパケットロス
-                result = PingResult(
-                    timestamp=timestamp.isoformat(),
-                    server=server,
-                    latency=None,
-                    packet_loss=True,
-                    timeout=True
-                )
-            elif random.random() < 0.05:  # 5%の確率で高レイテンシー
-                high_latency = base_latency + random.uniform(50, 200)
-                result = PingResult(
-                    timestamp=timestamp.isoformat(),
-                    server=server,
-                    latency=high_latency,
-                    packet_loss=False,
-                    timeout=False
-                )
-            else:
-                # 通常のレイテンシー（ジッターを含む）
-                jitter = random.uniform(-5, 5)
-                normal_latency = base_latency + jitter
-                result = PingResult(
-                    timestamp=timestamp.isoformat(),
-                    server=server,
-                    latency=max(1, normal_latency),  # 最小1ms
-                    packet_loss=False,
-                    timeout=False
-                )
-            
-            results.append(result)
-    
-    return results
+    total_seconds = duration_minutes * 60  # 秒単位でデータ生成
+    shape = (total_seconds, len(servers))
+
+    if rng is None:
+        rng = _rng
+    n_total = total_seconds * len(servers)
+
+    if _HAS_NUMBA and n_total >= _NUMBA_THRESHOLD:
+        # 大規模データはJITコンパイル済みカーネルで生成
+        flat_latency, flat_loss = _sample_latencies_numba(
+            n_total, 15.0, 35.0, -5.0, 5.0, 0.02, 0.05, 50.0, 200.0,
+            int(rng.integers(2 ** 31))
+        )
+        latency = flat_latency.reshape(shape)
+        loss_mask = flat_loss.reshape(shape)
+    else:
+        # 乱数をまとめて生成（ループ内の個別呼び出しより大幅に高速）
+        base_latency = rng.uniform(15, 35, shape)  # 東京サーバーの基本レイテンシー
+        selector = rng.random(shape)
+
+        # 累積確率境界へのsearchsortedで分岐を選択（0=ロス, 1=高レイテンシー, 2=通常）
+        branch = np.searchsorted(_BRANCH_EDGES, selector, side='right')
+        latency = np.choose(branch, [
+            np.full(shape, np.nan),                                  # パケットロス
+            base_latency + rng.uniform(50, 200, shape),              # 高レイテンシー
+            np.maximum(1, base_latency + rng.uniform(-5, 5, shape))  # 通常（ジッター含む、最小1ms）
+        ])
+        loss_mask = branch == 0
+
+    return _make_demo_buffer(start_time, servers, latency, loss_mask)
+
+
+def iter_demo_data(duration_minutes: int = 10, region: str = "Tokyo (Japan)",
+                   tracker: Optional[VALORANTServerTracker] = None,
+                   rng: Optional[np.random.Generator] = None):
+    """デモ用のパケットロスデータをPingResult単位で逐次生成
+
+    PingResultオブジェクトを1件ずつyieldするため、CSV書き出しなどの
+    消費側へリストを実体化せずにそのままパイプできる。
+    """
+    buffer = generate_demo_buffer(duration_minutes, region, tracker, rng)
+    if buffer is None:
+        return iter(())
+    return buffer.to_pingresults()
+
+
+def generate_demo_data(duration_minutes: int = 10, region: str = "Tokyo (Japan)",
+                       tracker: Optional[VALORANTServerTracker] = None,
+                       rng: Optional[np.random.Generator] = None) -> list:
+    """デモ用のパケットロスデータをPingResultのリストとして生成"""
+    return list(iter_demo_data(duration_minutes, region, tracker, rng))
 
 def run_demo():
     """デモンストレーション実行"""
@@ -79,23 +245,45 @@ def run_demo():
     console.print("📊 デモデータを生成中...")
     console.print("[dim]データ生成には数秒かかります...[/dim]")
     
-    # プログレスバーシミュレーション
-    import time
-    for i in range(5):
-        progress = (i + 1) * 20
-        bar = "█" * (progress // 5) + "░" * (20 - progress // 5)
-        console.print(f"\r[{bar}] {progress}%", end="")
-        time.sleep(0.5)
-    console.print("\n")
-    
-    demo_results = generate_demo_data(duration_minutes=10, region="Tokyo (Japan)")
-    
-    # 一般サービスのデモデータも生成
-    console.print("🌐 一般サービスのデモデータを生成中...")
-    reference_demo_data = generate_reference_demo_data(duration_minutes=5)
-    
-    # トラッカーにデモデータを設定
+    # トラッカーは1回だけ生成して生成処理にも使い回す
     tracker = VALORANTServerTracker()
+
+    console.print("🌐 一般サービスのデモデータも並行して生成します...")
+
+    # VALORANTと一般サービスのデータ生成は独立しているので並列実行する
+    # （シードはSeedSequenceから分岐させて互いに独立・再現可能にする）
+    seed_valorant, seed_reference = np.random.SeedSequence().spawn(2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        valorant_future = executor.submit(
+            generate_demo_buffer, 10, "Tokyo (Japan)", tracker,
+            np.random.default_rng(seed_valorant))
+        reference_future = executor.submit(
+            generate_reference_demo_buffer, 5,
+            np.random.default_rng(seed_reference))
+
+        # rich.progressは描画をまとめてくれるため、1行ごとのconsole.printより軽い
+        with Progress(console=console) as progress:
+            task = progress.add_task("データ生成中", total=100)
+            completed = 0
+            while not (valorant_future.done() and reference_future.done()):
+                completed = min(completed + 20, 95)
+                progress.update(task, completed=completed)
+                time.sleep(0.1)
+            progress.update(task, completed=100)
+
+        valorant_buffer = valorant_future.result()
+        reference_buffer = reference_future.result()
+    console.print()
+
+    demo_results = list(valorant_buffer.to_pingresults())
+    reference_demo_data = list(reference_buffer.to_pingresults())
+
+    # 生成データの概要をSoAバッファから一括集計して表示
+    buffer_stats = valorant_buffer.stats_per_server()
+    overall_loss = sum(s.packet_loss_rate for s in buffer_stats.values()) / len(buffer_stats)
+    console.print(f"[dim]生成データの平均パケットロス率: {overall_loss:.1f}%[/dim]")
+
+    # トラッカーにデモデータを設定
     tracker.results = demo_results
     tracker.reference_results = reference_demo_data
     tracker.current_region = "Tokyo (Japan)"
@@ -128,50 +316,58 @@ def run_demo():
     console.print("\n💡 実際のテストを行うには 'python main.py' を実行してください")
     console.print("[yellow]💡 実際のテストでは残り時間とプログレスバーが表示されます[/yellow]")
 
-def generate_reference_demo_data(duration_minutes: int = 5) -> list:
-    """一般サービス用のデモデータを生成"""
-    results = []
+def generate_reference_demo_buffer(duration_minutes: int = 5,
+                                   rng: Optional[np.random.Generator] = None) -> DemoBuffer:
+    """一般サービス用のデモデータをDemoBufferとして生成"""
     start_time = datetime.now() - timedelta(minutes=duration_minutes)
-    
+
     # 各サービスから1つずつサーバーを選択
     reference_servers = {
         "Discord": "162.159.130.232",
-        "YouTube (Google)": "8.8.8.8", 
+        "YouTube (Google)": "8.8.8.8",
         "Cloudflare": "1.1.1.1",
         "Amazon (AWS)": "52.95.110.1"
     }
-    
-    for minute in range(duration_minutes * 60):
-        timestamp = start_time + timedelta(seconds=minute)
-        
-        for service, server in reference_servers.items():
-            # 一般サービスは比較的安定
-            base_latency = random.uniform(10, 25)
-            
-            # 稀にパケットロス（0.5%の確率）
-            if random.random() < 0.005:
-                result = PingResult(
-                    timestamp=timestamp.isoformat(),
-                    server=f"{service}|{server}",
-                    latency=None,
-                    packet_loss=True,
-                    timeout=True
-                )
-            else:
-                # 通常のレイテンシー
-                jitter = random.uniform(-3, 3)
-                normal_latency = base_latency + jitter
-                result = PingResult(
-                    timestamp=timestamp.isoformat(),
-                    server=f"{service}|{server}",
-                    latency=max(1, normal_latency),
-                    packet_loss=False,
-                    timeout=False
-                )
-            
-            results.append(result)
-    
-    return results
+
+    labels = [f"{service}|{server}" for service, server in reference_servers.items()]
+    total_seconds = duration_minutes * 60
+    shape = (total_seconds, len(labels))
+
+    if rng is None:
+        rng = _rng
+    n_total = total_seconds * len(labels)
+
+    if _HAS_NUMBA and n_total >= _NUMBA_THRESHOLD:
+        # 大規模データはJITコンパイル済みカーネル（高レイテンシー分岐なし）
+        flat_latency, flat_loss = _sample_latencies_numba(
+            n_total, 10.0, 25.0, -3.0, 3.0, 0.005, 0.0, 0.0, 0.0,
+            int(rng.integers(2 ** 31))
+        )
+        latency = flat_latency.reshape(shape)
+        loss_mask = flat_loss.reshape(shape)
+    else:
+        # 乱数をまとめて生成（一般サービスは比較的安定）
+        base_latency = rng.uniform(10, 25, shape)
+        selector = rng.random(shape)
+        jitter = rng.uniform(-3, 3, shape)
+
+        # 稀にパケットロス（0.5%の確率）
+        loss_mask = selector < 0.005
+        latency = np.where(loss_mask, np.nan, np.maximum(1, base_latency + jitter))
+
+    return _make_demo_buffer(start_time, labels, latency, loss_mask)
+
+
+def iter_reference_demo_data(duration_minutes: int = 5,
+                             rng: Optional[np.random.Generator] = None):
+    """一般サービス用のデモデータをPingResult単位で逐次生成"""
+    return generate_reference_demo_buffer(duration_minutes, rng).to_pingresults()
+
+
+def generate_reference_demo_data(duration_minutes: int = 5,
+                                 rng: Optional[np.random.Generator] = None) -> list:
+    """一般サービス用のデモデータをPingResultのリストとして生成"""
+    return list(iter_reference_demo_data(duration_minutes, rng))
 
 if __name__ == "__main__":
     run_demo()
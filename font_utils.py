@@ -3,12 +3,26 @@
 日本語フォントの自動検出と設定を行う
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
 import platform
 import os
+from functools import lru_cache
 from pathlib import Path
 
+# matplotlibのインポートは数百ミリ秒かかるため、モジュール読み込み時ではなく
+# フォント設定が実際に必要になった時点で行う（2回目以降はsys.modulesから即座に返る）
+
+# インストール済みフォント名の集合（初回利用時に1度だけ構築して使い回す）
+_AVAILABLE_FONTS = None
+
+def _available_fonts():
+    """インストール済みフォント名のfrozensetを返す"""
+    global _AVAILABLE_FONTS
+    if _AVAILABLE_FONTS is None:
+        import matplotlib.font_manager as fm
+        _AVAILABLE_FONTS = frozenset(f.name for f in fm.fontManager.ttflist)
+    return _AVAILABLE_FONTS
+
+@lru_cache(maxsize=1)
 def find_japanese_fonts():
     """システムで利用可能な日本語フォントを検索"""
     # システム別のフォント候補
@@ -39,7 +53,8 @@ def find_japanese_fonts():
     }
     
     system = platform.system()
-    available_fonts = [f.name for f in fm.fontManager.ttflist]
+    # frozensetなので候補ごとの存在チェックがO(1)になる
+    available_fonts = _available_fonts()
     
     # システム固有のフォントを優先して検索
     if system in font_candidates:
@@ -57,6 +72,8 @@ def find_japanese_fonts():
 
 def setup_matplotlib_japanese():
     """matplotlibの日本語フォント設定"""
+    import matplotlib.pyplot as plt
+
     try:
         # 日本語フォントを検索
         japanese_font = find_japanese_fonts()
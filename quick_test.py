@@ -4,12 +4,15 @@ VALORANT パケットロス追跡ツール - クイックテスト
 残り時間表示のテスト用
 """
 
+import os
 import time
-import threading
+from collections import deque
+import socket
+import struct
+import selectors
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
-import statistics
 
 import ping3
 from rich.console import Console
@@ -23,7 +26,8 @@ from colorama import init, Fore, Style
 init(autoreset=True)
 console = Console()
 
-@dataclass
+# pingごとに大量生成されるため、__dict__を持たないslotsインスタンスにする
+@dataclass(slots=True)
 class PingResult:
     """Pingテストの結果を格納するクラス"""
     timestamp: str
@@ -42,12 +46,175 @@ class QuickTester:
         self.timeout = timeout
         self.interval = interval
         self.results: List[PingResult] = []
+        # 逐次統計（追加ごとにO(1)更新、表示時に全件を畳み直さない）
+        self._stat_n = 0
+        self._stat_loss = 0
+        self._stat_mean = 0.0
+        self._stat_min = 0.0
+        self._stat_max = 0.0
+        # 直近10件のレイテンシー（ロスはNone）の固定長ウィンドウ
+        self._recent: deque = deque(maxlen=10)
         self.is_running = False
         self.start_time = None
-        
+        # 一斉ping用のICMP識別子とシーケンス番号
+        self._icmp_id = os.getpid() & 0xFFFF
+        self._icmp_seq = 0
+        # echoパケットはseqフィールド以外固定なので、テンプレートを1つ
+        # 作っておき、送信時はseqの書き換えとチェックサムの差分更新だけ行う
+        # （宛先はsendtoで渡すためテンプレートは全サーバー共通でよい）
+        header = struct.pack("!BBHHH", 8, 0, 0, self._icmp_id, 0)
+        payload = b"quicktest" * 3
+        self._pkt_base_chk = self._checksum(header + payload)  # seq=0時の値
+        self._pkt_template = bytearray(
+            struct.pack("!BBHHH", 8, 0, self._pkt_base_chk, self._icmp_id, 0) + payload
+        )
+        # rawソケットが使えない環境を覚えておき、毎回試さない
+        self._batch_ok = True
+        # Live表示用の、サーバーごとの最新結果行
+        self._last_lines: Dict[str, str] = {}
+        # タイムスタンプ文字列は秒が変わった時だけstrftimeし直す
+        self._last_sec = -1
+        self._last_str = ""
+
+    def _timestamp(self) -> str:
+        """現在時刻の文字列（同じ秒の間はキャッシュを返す）"""
+        sec = int(time.time())
+        if sec != self._last_sec:
+            self._last_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+            self._last_sec = sec
+        return self._last_str
+
+    @staticmethod
+    def _checksum(data: bytes) -> int:
+        """ICMPチェックサム（RFC 1071）を計算"""
+        if len(data) % 2:
+            data += b"\x00"
+        total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+        total = (total >> 16) + (total & 0xFFFF)
+        total += total >> 16
+        return ~total & 0xFFFF
+
+    @staticmethod
+    def _incremental_checksum(checksum: int, old_field: int, new_field: int) -> int:
+        """16ビットフィールド1つの差し替え後のチェックサム（RFC 1624）
+
+        全体を足し直さず、旧値と新値の差分だけで更新する。
+        """
+        total = (~checksum & 0xFFFF) + (~old_field & 0xFFFF) + new_field
+        total = (total >> 16) + (total & 0xFFFF)
+        total += total >> 16
+        return ~total & 0xFFFF
+
+    def _open_icmp_socket(self) -> Tuple[socket.socket, bool]:
+        """ICMPソケットを開く（raw→非特権DGRAMの順に試す）
+
+        戻り値は (ソケット, rawかどうか)。rawは受信データにIPヘッダーが付く。
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            raw = True
+        except PermissionError:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            raw = False
+        sock.setblocking(False)
+        return sock, raw
+
+    def ping_batch(self, servers: List[str]) -> List[PingResult]:
+        """全サーバーへ一斉にICMP echoを送り、応答を到着順に回収する
+
+        直列にping_serverを呼ぶと待ち時間がサーバー数×タイムアウトまで
+        伸びるため、1つの非ブロッキングソケットから全echoを送信し、
+        selectorsで応答を待つ。ソケットが作れない環境では従来どおり
+        1台ずつping_serverで測る。
+        """
+        if not self._batch_ok:
+            return [self.ping_server(server) for server in servers]
+
+        try:
+            sock, raw = self._open_icmp_socket()
+        except OSError:
+            self._batch_ok = False
+            return [self.ping_server(server) for server in servers]
+
+        timestamp = self._timestamp()
+        pending: Dict[int, str] = {}   # seq -> server
+        send_ts: Dict[int, float] = {}  # seq -> 送信時刻
+        latencies: Dict[str, float] = {}
+
+        with sock, selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_READ)
+
+            packet = self._pkt_template
+            for server in servers:
+                self._icmp_seq = (self._icmp_seq + 1) & 0xFFFF
+                seq = self._icmp_seq
+                # テンプレートのseqフィールドだけ書き換え、チェックサムは差分更新
+                struct.pack_into("!H", packet, 2,
+                                 self._incremental_checksum(self._pkt_base_chk, 0, seq))
+                struct.pack_into("!H", packet, 6, seq)
+                try:
+                    sock.sendto(packet, (server, 0))
+                except OSError:
+                    continue  # 送れなかった分はロス扱いで残す
+                pending[seq] = server
+                send_ts[seq] = time.perf_counter()
+
+            # 全応答をタイムアウトの予算内で回収する
+            deadline = time.perf_counter() + self.timeout
+            while pending:
+                budget = deadline - time.perf_counter()
+                if budget <= 0 or not selector.select(budget):
+                    break
+                now = time.perf_counter()
+                try:
+                    data, _ = sock.recvfrom(2048)
+                except OSError:
+                    continue
+                if raw:
+                    data = data[(data[0] & 0x0F) * 4:]  # IPヘッダーを読み飛ばす
+                if len(data) < 8:
+                    continue
+                reply_type, _, _, reply_id, reply_seq = struct.unpack_from("!BBHHH", data)
+                # rawソケットにはホスト宛の全echo応答が届くため、idで自分の
+                # プローブに絞る。非特権DGRAMではカーネルがidを書き換えるので
+                # seqのみで照合する
+                if reply_type == 0 and (not raw or reply_id == self._icmp_id) and reply_seq in pending:
+                    server = pending.pop(reply_seq)
+                    latencies[server] = (now - send_ts[reply_seq]) * 1000
+
+        results = []
+        for server in servers:
+            latency_ms = latencies.get(server)
+            if latency_ms is None:
+                results.append(PingResult(timestamp, server, None, True, True))
+            else:
+                results.append(PingResult(timestamp, server, latency_ms, False, False))
+        return results
+
+    def _append_result(self, result: PingResult):
+        """結果を追加し、逐次統計を更新する"""
+        self.results.append(result)
+        self._recent.append(result.latency)
+
+        self._stat_n += 1
+        if result.latency is None:
+            self._stat_loss += 1
+        else:
+            x = result.latency
+            successes = self._stat_n - self._stat_loss
+            if successes == 1:
+                self._stat_min = self._stat_max = x
+            else:
+                if x < self._stat_min:
+                    self._stat_min = x
+                if x > self._stat_max:
+                    self._stat_max = x
+            # 逐次平均（Welford法の平均項）
+            self._stat_mean += (x - self._stat_mean) / successes
+
     def ping_server(self, server: str) -> PingResult:
         """サーバーにpingを送信"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = self._timestamp()
         
         try:
             latency = ping3.ping(server, timeout=self.timeout)
@@ -76,47 +243,50 @@ class QuickTester:
         console.print(f"[blue]🏁 終了予定時刻: {end_time.strftime('%H:%M:%S')}[/blue]")
         console.print()
         
+        self._last_lines.clear()
+
         try:
-            while self.is_running and datetime.now() < end_time:
-                current_time = datetime.now()
-                
-                # 残り時間計算
-                remaining_time = end_time - current_time
-                remaining_minutes = int(remaining_time.total_seconds() // 60)
-                remaining_seconds = int(remaining_time.total_seconds() % 60)
-                
-                # 進捗計算
-                elapsed_time = current_time - self.start_time
-                progress_percentage = min(100, (elapsed_time.total_seconds() / duration_seconds) * 100)
-                
-                for server in servers:
-                    if not self.is_running:
-                        break
-                        
-                    result = self.ping_server(server)
-                    self.results.append(result)
-                    
-                    # リアルタイム結果表示（改善された時間表示付き）
-                    status = "❌ LOSS" if result.packet_loss else f"✅ {result.latency:.1f}ms"
-                    progress_bar = "█" * int(progress_percentage // 5) + "░" * (20 - int(progress_percentage // 5))
-                    
+            # pingごとのconsole.printは出力のたびにスタイル再描画とフラッシュが
+            # 走るため、1つのLive領域をリフレッシュ間隔でまとめて描画する
+            with Live(console=console, refresh_per_second=4) as live:
+                while self.is_running and datetime.now() < end_time:
+                    current_time = datetime.now()
+
+                    # 残り時間計算
+                    remaining_time = end_time - current_time
+                    remaining_minutes = int(remaining_time.total_seconds() // 60)
+                    remaining_seconds = int(remaining_time.total_seconds() % 60)
+
+                    # 進捗計算
+                    elapsed_time = current_time - self.start_time
+                    progress_percentage = min(100, (elapsed_time.total_seconds() / duration_seconds) * 100)
+
                     # より詳細な時間表示
                     elapsed_minutes = int(elapsed_time.total_seconds() // 60)
                     elapsed_seconds_remainder = int(elapsed_time.total_seconds() % 60)
                     time_info = f"⏱️ {elapsed_minutes:02d}:{elapsed_seconds_remainder:02d} / {remaining_minutes:02d}:{remaining_seconds:02d}"
-                    
-                    console.print(
-                        f"[dim]{result.timestamp[-8:]}[/dim] {server}: {status} "
-                        f"[cyan]│[/cyan] [{progress_bar}] {progress_percentage:.1f}% "
-                        f"[yellow]{time_info}[/yellow]"
-                    )
-                    
+
+                    # 全サーバーへ同時にpingを送信（直列だと待ち時間が積み上がる）
+                    batch = self.ping_batch(servers)
+                    if not self.is_running:
+                        break
+
+                    for result in batch:
+                        self._append_result(result)
+                        status = "❌ LOSS" if result.packet_loss else f"✅ {result.latency:.1f}ms"
+                        self._last_lines[result.server] = (
+                            f"[dim]{result.timestamp[-8:]}[/dim] {result.server}: {status}"
+                        )
+
+                    live.update(self._build_status_panel(progress_percentage, time_info))
+
                     # リアルタイム統計表示（10秒ごと）
                     if int(elapsed_time.total_seconds()) % 10 == 0 and elapsed_time.total_seconds() > 0:
                         self._show_quick_stats()
-                    
+
+                    # スリープはサーバーごとではなくサイクルごとに1回
                     time.sleep(self.interval)
-                    
+
         except KeyboardInterrupt:
             console.print("\n[yellow]⚠️ テストが中断されました[/yellow]")
         finally:
@@ -124,40 +294,44 @@ class QuickTester:
             elapsed_time = datetime.now() - self.start_time
             console.print(f"\n[green]✅ テストが完了しました（実行時間: {elapsed_time.total_seconds():.0f}秒）[/green]")
             
-        # 簡単な統計表示
-        if self.results:
-            successful_pings = [r for r in self.results if not r.packet_loss]
-            lost_packets = len([r for r in self.results if r.packet_loss])
-            total_packets = len(self.results)
-            packet_loss_rate = (lost_packets / total_packets) * 100 if total_packets > 0 else 0
-            
+        # 簡単な統計表示（逐次統計を読むだけで再集計しない）
+        if self._stat_n:
+            packet_loss_rate = (self._stat_loss / self._stat_n) * 100
+
             console.print(f"\n[cyan]📊 テスト結果:[/cyan]")
-            console.print(f"   総パケット: {total_packets}")
-            console.print(f"   パケットロス: {lost_packets} ({packet_loss_rate:.1f}%)")
-            
-            if successful_pings:
-                latencies = [r.latency for r in successful_pings]
-                avg_latency = statistics.mean(latencies)
-                min_latency = min(latencies)
-                max_latency = max(latencies)
-                
-                console.print(f"   平均レイテンシー: {avg_latency:.1f}ms")
-                console.print(f"   最小/最大: {min_latency:.1f}/{max_latency:.1f}ms")
+            console.print(f"   総パケット: {self._stat_n}")
+            console.print(f"   パケットロス: {self._stat_loss} ({packet_loss_rate:.1f}%)")
+
+            if self._stat_n > self._stat_loss:
+                console.print(f"   平均レイテンシー: {self._stat_mean:.1f}ms")
+                console.print(f"   最小/最大: {self._stat_min:.1f}/{self._stat_max:.1f}ms")
                 
+    def _build_status_panel(self, progress_percentage: float, time_info: str) -> Panel:
+        """Live表示用の現在状況パネルを組み立てる"""
+        filled = int(progress_percentage // 5)
+        progress_bar = "█" * filled + "░" * (20 - filled)
+        return Panel(
+            "\n".join(self._last_lines.values()),
+            title=f"[{progress_bar}] {progress_percentage:.1f}% [yellow]{time_info}[/yellow]",
+            border_style="cyan",
+        )
+
     def _show_quick_stats(self):
         """クイック統計表示"""
         if len(self.results) < 5:
             return
-            
-        recent_results = self.results[-10:]  # 最新の10件
-        lost_packets = len([r for r in recent_results if r.packet_loss])
-        successful_pings = [r for r in recent_results if not r.packet_loss]
-        
-        if recent_results:
-            loss_rate = (lost_packets / len(recent_results)) * 100
-            avg_latency = statistics.mean([r.latency for r in successful_pings]) if successful_pings else 0
-            
-            console.print(f"[dim]    📊 直近10件: ロス {loss_rate:.0f}% | 平均 {avg_latency:.1f}ms[/dim]")
+
+        # 最新の10件（固定長リングバッファを1回だけ走査し、中間リストも作らない）
+        total = 0.0
+        successes = 0
+        for x in self._recent:
+            if x is not None:
+                total += x
+                successes += 1
+        loss_rate = (1 - successes / len(self._recent)) * 100
+        avg_latency = total / successes if successes else 0
+
+        console.print(f"[dim]    📊 直近10件: ロス {loss_rate:.0f}% | 平均 {avg_latency:.1f}ms[/dim]")
 
 def main():
     """メイン関数"""